@@ -3,36 +3,195 @@ File System Handler Module for SDC AWS File System Watcher
 """
 
 import sys
+import logging
 import os
 import time
 from datetime import datetime
-from urllib import parse
 from pathlib import Path
-import subprocess
+import atexit
+import importlib.util
+import inspect
+import hashlib
+import heapq
+import itertools
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import BoundedSemaphore, Condition, Lock, Thread
+from queue import Empty, Full, Queue
 import boto3
 import botocore
-from boto3.s3.transfer import TransferConfig, S3Transfer
+from boto3.s3.transfer import TransferConfig, S3Transfer, create_transfer_manager
 from slack_sdk.errors import SlackApiError
 from fswatcher import (
     log,
     is_file_manifest,
     generate_file_pipeline_message,
-    get_message_ts,
     get_slack_client,
     send_slack_notification,
     timestream_log,
+    generate_timestream_record,
+    write_timestream_records,
+    TIMESTREAM_MAX_RECORDS,
 )
 from fswatcher.FileSystemHandlerEvent import FileSystemHandlerEvent
 from fswatcher.FileSystemHandlerConfig import FileSystemHandlerConfig
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import (
     FileSystemEvent,
     FileOpenedEvent,
     FileClosedEvent,
     FileSystemEventHandler,
     FileMovedEvent,
+    FileModifiedEvent,
     FileDeletedEvent,
 )
-from typing import List, Optional, Union, Dict, Any, Tuple
+from typing import List, Optional, Dict, Tuple, FrozenSet
+
+# Check if the AWS Common Runtime (CRT) transfer client is available (boto3>=1.33 installed with the crt extra)
+HAS_CRT = (
+    importlib.util.find_spec("awscrt") is not None
+    and "preferred_transfer_client"
+    in inspect.signature(TransferConfig.__init__).parameters
+)
+
+# Number of bytes in a megabyte
+MB = 1024 * 1024
+
+# Largest file whose content is hashed to tell a touched file from a changed one
+FINGERPRINT_MAX_SIZE = 64 * MB
+
+# Event types that never result in an upload
+IGNORED_EVENT_TYPES = (FileOpenedEvent, FileClosedEvent)
+
+# Filesystem types of network mounts, where changes made by other hosts do not create inotify events
+NETWORK_FILESYSTEMS = frozenset(
+    {"nfs", "nfs4", "cifs", "smb", "smb3", "smbfs", "afs", "9p", "fuse.sshfs"}
+)
+
+# Kernel setting for the maximum number of inotify watches per user (Linux Only)
+INOTIFY_MAX_USER_WATCHES = "/proc/sys/fs/inotify/max_user_watches"
+
+
+def get_filesystem_type(path: str) -> Optional[str]:
+    """
+    Function to get the filesystem type of the mount containing the path from /proc/mounts (Linux Only)
+    """
+    path = os.path.realpath(path)
+    mount_point = ""
+    filesystem_type = None
+
+    try:
+        with open("/proc/mounts") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+
+                # Keep the deepest mount point containing the path
+                mount = fields[1].replace("\\040", " ")
+                if (path == mount or path.startswith(f"{mount.rstrip('/')}/")) and len(
+                    mount
+                ) >= len(mount_point):
+                    mount_point = mount
+                    filesystem_type = fields[2]
+    except OSError:
+        return None
+
+    return filesystem_type
+
+
+def count_directories(path: str) -> int:
+    """
+    Function to count the directories of a tree, the number of inotify watches a recursive observer of it needs
+    """
+    count = 0
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        count += 1
+        try:
+            with os.scandir(directory) as entries:
+                pending.extend(
+                    entry.path
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                )
+        except OSError:
+            continue
+
+    return count
+
+
+def raise_inotify_watch_limit(watches_needed: int) -> bool:
+    """
+    Function to raise the inotify watch limit by the number of watches needed, which only succeeds when running with enough privileges
+    """
+    try:
+        with open(INOTIFY_MAX_USER_WATCHES, "r+") as max_user_watches:
+            limit = int(max_user_watches.read())
+
+            # Add the watches needed on top of the current limit, as other processes of the user use part of it
+            new_limit = limit + watches_needed
+            max_user_watches.seek(0)
+            max_user_watches.write(str(new_limit))
+    except (OSError, ValueError) as e:
+        log.debug(f"Unable to raise the inotify watch limit: {e}")
+        return False
+
+    log.info(f"Raised the inotify watch limit from {limit} to {new_limit}")
+    return True
+
+
+def get_inotify_fds() -> FrozenSet[int]:
+    """
+    Function to get the file descriptors of the inotify instances open in this process (Linux Only)
+    """
+    inotify_fds = set()
+    try:
+        for fd in os.listdir("/proc/self/fd"):
+            try:
+                if os.readlink(f"/proc/self/fd/{fd}") == "anon_inode:inotify":
+                    inotify_fds.add(int(fd))
+            except OSError:
+                continue
+    except OSError:
+        pass
+
+    return frozenset(inotify_fds)
+
+
+def release_observer(observer: BaseObserver, inotify_fds: FrozenSet[int]) -> None:
+    """
+    Function to stop an observer that failed to start and close the inotify instances it left open, given the ones open before it started.
+    watchdog does not close the inotify instance when adding a watch fails, so its watches would keep counting against the limit
+    """
+    observer.stop()
+    if observer.is_alive():
+        observer.join()
+
+    for fd in get_inotify_fds() - inotify_fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def make_observer(path: str, poll_interval: int) -> BaseObserver:
+    """
+    Function to create the observer for the path, polling network mounts and using native filesystem events otherwise
+    """
+    filesystem_type = get_filesystem_type(path)
+
+    if filesystem_type in NETWORK_FILESYSTEMS:
+        log.info(
+            f"Path ({path}) is on a network filesystem ({filesystem_type}), polling every {poll_interval} seconds"
+        )
+        return PollingObserver(timeout=poll_interval)
+
+    return Observer()
 
 
 class FileSystemHandler(FileSystemEventHandler):
@@ -40,8 +199,25 @@ class FileSystemHandler(FileSystemEventHandler):
     Subclass to handle file system events
     """
 
-    events: List[FileSystemHandlerEvent] = []
-    dead_letter_queue: List[dict] = []
+    inflight_paths: Dict[str, Optional[FileSystemEvent]]
+    fingerprints: "OrderedDict[str, Tuple[int, int, Optional[str]]]"
+    fingerprints_cache_size: int = 4096
+    list_prefix_threshold: int = 8
+    ignored_filenames: FrozenSet[str] = frozenset({"hermes.log"})
+    dead_letter_queue: List[Tuple[float, int, int, str]]
+    max_upload_attempts: int = 5
+    slack_queue_size: int = 10000
+    slack_batch_interval: float = 1.0
+    slack_batch_size: int = 50
+    slack_summary_interval: float = 3600.0
+    event_queue_size: int = 10000
+    coalesce_window: float = 0.2
+    coalesce_max_delay: float = 1.0
+    coalesce_max_batch: int = 10000
+    timestream_flush_interval: float = 5.0
+    session_max_age: float = 900.0
+    min_refresh_interval: float = 5.0
+    walk_workers: int = 8
 
     def __init__(
         self,
@@ -58,10 +234,52 @@ class FileSystemHandler(FileSystemEventHandler):
         self.allow_delete = config.allow_delete
 
         # Initialize the concurrency_limit (Max number of concurrent S3 Uploads)
-        self.concurrency_limit = config.concurrency_limit
+        self.concurrency_limit = config.concurrency_limit or 20
 
-        # Time since last refresh
+        # Time since last refresh, refreshes are serialized by a lock as they run on the upload workers
         self.last_refresh_time = time.time()
+        self.refresh_lock = Lock()
+        self.retired_s3t = None
+
+        # Initialize the paths with an event being handled, mapped to the latest event that arrived for
+        # the path while it was in flight. Events for a path are handled one at a time, in order
+        self.inflight_paths = {}
+        self.inflight_paths_lock = Lock()
+
+        # Initialize the bounded LRU of fingerprints of uploaded files, keyed by file key
+        self.fingerprints = OrderedDict()
+        self.fingerprints_lock = Lock()
+
+        # Initialize the worker pool that handles events off the observer thread
+        self.upload_pool = ThreadPoolExecutor(
+            max_workers=self.concurrency_limit, thread_name_prefix="fswatcher-s3"
+        )
+
+        # Bound the number of events queued or running in the worker pool
+        self.inflight_events = BoundedSemaphore(self.concurrency_limit * 4)
+
+        # Let queued events finish before the interpreter exits
+        atexit.register(self.upload_pool.shutdown, wait=True)
+
+        # Initialize the queue of raw events, drained and coalesced by a background thread
+        self.event_queue = Queue(maxsize=self.event_queue_size)
+        Thread(
+            target=self._coalesce_worker, name="fswatcher-coalesce", daemon=True
+        ).start()
+
+        # Initialize the dead letter queue, a heap of uploads waiting to be retried
+        self.dead_letter_queue = []
+        self.dead_letter_condition = Condition()
+        self.dead_letter_counter = itertools.count()
+        Thread(
+            target=self._dead_letter_worker, name="fswatcher-dlq", daemon=True
+        ).start()
+
+        # Warn if the CRT transfer client is requested but cannot be used
+        if config.use_crt and not HAS_CRT:
+            log.warning(
+                "CRT transfer client requested but not available (requires boto3>=1.33 with the crt extra), using the default transfer client"
+            )
 
         # Check if bucket name is and accessible using boto
         try:
@@ -74,16 +292,13 @@ class FileSystemHandler(FileSystemEventHandler):
                 else boto3.session.Session(region_name=config.aws_region)
             )
 
-            # Initialize S3 Transfer Manager with concurrency limit
-            botocore_config = botocore.config.Config(
-                max_pool_connections=self.concurrency_limit
-            )
-            self.s3_client = self.boto3_session.client("s3", config=botocore_config)
-            transfer_config = TransferConfig(
-                use_threads=True,
-                max_concurrency=self.concurrency_limit,
+            # Initialize S3 Transfer Manager with concurrency limit. It is shared by all upload workers
+            # until the session is refreshed, see _refresh_boto_session
+            self.s3_client = self.boto3_session.client(
+                "s3", config=self._get_botocore_config()
             )
-            self.s3t = S3Transfer(self.s3_client, transfer_config)
+            self.s3t = self._get_s3_transfer()
+            self.timestream_client = self._get_timestream_client()
 
         except botocore.exceptions.ClientError as e:
             # If a client error is thrown, then check that it was a 404 error.
@@ -108,13 +323,27 @@ class FileSystemHandler(FileSystemEventHandler):
         # Initialize the timestream table
         self.timestream_table = config.timestream_table
 
+        # Initialize the buffer of Timestream records, flushed when full or periodically by a background thread
+        self.timestream_records = []
+        self.timestream_lock = Lock()
+        if self.timestream_db and self.timestream_table:
+            Thread(
+                target=self._timestream_worker, name="fswatcher-timestream", daemon=True
+            ).start()
+            atexit.register(self._flush_timestream_records)
+
         # Check s3
         if config.check_s3 == True:
             self.check_with_s3 = True
         else:
             self.check_with_s3 = False
 
-        # Initialize the slack client
+        # Method used to check files against S3 ("head" or "list")
+        self.check_s3_mode = config.check_s3_mode
+
+        # Initialize the slack client, Slack is disabled unless a token is configured
+        self.slack_client = None
+        self.slack_channel = None
         if config.slack_token is not None:
             try:
                 # Initialize the slack client
@@ -132,13 +361,27 @@ class FileSystemHandler(FileSystemEventHandler):
                             "message": f"Slack Token ({config.slack_token}) is invalid",
                         }
                     )
-        else:
-            self.slack_client = None
 
-        # Validate the path
-        if not os.path.exists(config.path):
+        # Initialize the Slack notification queues, drained once per batch interval by a background thread.
+        # File events are posted in batches and uploads are reported in a periodic summary.
+        self.slack_queue = Queue(maxsize=self.slack_queue_size)
+        self.slack_event_paths = Queue(maxsize=self.slack_queue_size)
+        self.slack_dropped = 0
+        self.slack_dropped_lock = Lock()
+        self.slack_uploads = 0
+        self.slack_uploads_lock = Lock()
+        if self.slack_client is not None:
+            Thread(
+                target=self._slack_worker, name="fswatcher-slack", daemon=True
+            ).start()
+
+        # Validate the path once, it must be a directory to be watched
+        if not os.path.isdir(config.path):
             log.error(
-                {"status": "ERROR", "message": f"Path ({config.path}) does not exist"}
+                {
+                    "status": "ERROR",
+                    "message": f"Path ({config.path}) does not exist or is not a directory",
+                }
             )
 
             sys.exit(1)
@@ -150,147 +393,221 @@ class FileSystemHandler(FileSystemEventHandler):
             log.info("Performing Push/Remove Test Run")
             self._test_iam_policy()
 
+    def dispatch(self, event: FileSystemEvent) -> None:
+        """
+        Overloaded Function to hand every event straight to on_any_event, skipping the per event type handler lookup
+        """
+        self.on_any_event(event)
+
     def on_any_event(self, event: FileSystemEvent) -> None:
         """
         Overloaded Function to deal with any event
         """
-        # Filter the event
-        filtered_event = self._filter_event(event)
-
-        if filtered_event is None:
+        # Skip ignored events
+        if self._is_ignored_event(event):
             return
 
-        # Append the event to the list of events
-        self.events.append(filtered_event)
+        # Queue the event to be coalesced with the rest of its burst
+        self.event_queue.put(event)
 
-        # Handle the event
-        self._handle_event(filtered_event)
-
-    def _filter_event(self, event: FileSystemEvent) -> FileSystemHandlerEvent or None:
+    @staticmethod
+    def _coalesce_key(event: FileSystemEvent) -> str:
         """
-        Function to filter events
+        Function to get the path an event will upload or delete, events of a burst on the same path are coalesced
         """
-        # Skip if file is hermes.log file
-        if "hermes.log" in event.src_path:
-            return None
+        return getattr(event, "dest_path", "") or event.src_path
 
-        # Skip closed events
-        if isinstance(event, FileClosedEvent):
-            return None
+    def _coalesce_worker(self) -> None:
+        """
+        Function run by a background thread to drain bursts of queued events and dispatch only the latest event per path
+        """
+        while True:
+            event = self.event_queue.get()
+            batch = {self._coalesce_key(event): event}
+
+            # Keep draining until the burst goes quiet or the maximum delay is reached
+            deadline = time.monotonic() + self.coalesce_max_delay
+            while len(batch) < self.coalesce_max_batch:
+                timeout = min(self.coalesce_window, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+
+                try:
+                    event = self.event_queue.get(timeout=timeout)
+                except Empty:
+                    break
+
+                # Replace any earlier event on the same path, keeping the latest order
+                key = self._coalesce_key(event)
+                batch.pop(key, None)
+                batch[key] = event
+
+            for event in batch.values():
+                try:
+                    self._dispatch_event(event)
+                except Exception as e:
+                    log.error(e)
+
+    def _dispatch_event(self, event: FileSystemEvent, attempt: int = 0) -> None:
+        """
+        Function to hand an event to the worker pool, or to mark its path dirty if the path is already being handled
+        """
+        key = self._coalesce_key(event)
+        with self.inflight_paths_lock:
+            if key in self.inflight_paths:
+                # Keep the latest event, it is handled once the in-flight event finishes. A retry is dropped
+                # instead, as the in-flight event handles the current content of the path
+                if attempt == 0:
+                    self.inflight_paths[key] = event
+                return
+
+            self.inflight_paths[key] = None
+
+        # Wait for room in the worker pool, then handle the event in the background
+        self.inflight_events.acquire()
+        self._submit_event(event, attempt)
+
+    def _submit_event(self, event: FileSystemEvent, attempt: int = 0) -> None:
+        """
+        Function to submit an event to the worker pool, using a worker pool slot already acquired for it
+        """
+        try:
+            self.upload_pool.submit(
+                self._handle_event, self._filter_event(event), attempt
+            )
+        except RuntimeError as e:
+            # The worker pool has been shut down, so free the path and the slot
+            log.warning("Object (%s) - Not handled: %s", event.src_path, e)
+            with self.inflight_paths_lock:
+                self.inflight_paths.pop(self._coalesce_key(event), None)
+            self.inflight_events.release()
+
+    def _handle_next_event(self, event: FileSystemHandlerEvent) -> None:
+        """
+        Function to re-dispatch the latest event that arrived for a path while it was in flight, or free the path
+        """
+        key = event.get_path()
+        with self.inflight_paths_lock:
+            next_event = self.inflight_paths.get(key)
+            if next_event is None:
+                self.inflight_paths.pop(key, None)
+            else:
+                self.inflight_paths[key] = None
 
-        # Skip closed events
-        if isinstance(event, FileOpenedEvent):
-            return None
+        if next_event is None:
+            self.inflight_events.release()
+            return
 
-        # Skip if directory
-        if event.is_directory:
-            return None
+        # Pass the worker pool slot on to the next event of the path
+        self._submit_event(next_event)
 
-        # Initialize the file system event
-        file_system_event = FileSystemHandlerEvent(
+    def _filter_event(self, event: FileSystemEvent) -> FileSystemHandlerEvent:
+        """
+        Function to build the file system event handled by the worker pool
+        """
+        return FileSystemHandlerEvent(
             event=event,
             watch_path=self.path,
             bucket_name=self.bucket_name,
         )
 
-        # Skip if duplicate event
-        if file_system_event in self.events:
-            return None
+    def _is_ignored_event(self, event: FileSystemEvent) -> bool:
+        """
+        Function to check if an event should be ignored, cheapest checks first
+        """
+        # Skip if directory
+        if event.is_directory:
+            return True
 
-        return file_system_event
+        # Skip opened and closed events
+        if isinstance(event, IGNORED_EVENT_TYPES):
+            return True
+
+        # Skip if the file name is ignored (e.g. hermes.log file)
+        return os.path.basename(event.src_path) in self.ignored_filenames
 
-    def _handle_event(self, event: FileSystemHandlerEvent) -> None:
+    def _handle_event(self, event: FileSystemHandlerEvent, attempt: int = 0) -> None:
         """
-        Function to handle file events and upload to S3
+        Function to handle file events and upload to S3, attempt counts the earlier failed uploads of the path
         """
         try:
-            # Get the log message
-            log_message = event.get_log_message()
+            # Log the event, only building the message if INFO is enabled
+            if log.isEnabledFor(logging.INFO):
+                log.info(event.get_log_message())
 
-            # Capital Case Action Type
-            log.info(log_message)
+            # Get the local path and S3 file key once for the whole pipeline
+            path = event.get_path()
+            file_key = event.get_parsed_path()
 
+            # Stat the file once for the fingerprint and the object tags, and fingerprint it so
+            # unchanged content is not uploaded again
+            fingerprint = None
             if event.action_type != "DELETE":
-                # Send Slack Notification about the event
-                if self.slack_client is not None:
-                    try:
-                        slack_message = generate_file_pipeline_message(event.get_path())
-                        send_slack_notification(
-                            slack_client=self.slack_client,
-                            slack_channel=self.slack_channel,
-                            slack_message=slack_message,
-                        )
-                    except Exception as e:
-                        log.error(e)
+                object_stats = os.stat(path)
+                fingerprint = self._get_fingerprint(file_key, path, object_stats)
+
+            if fingerprint is not None and self._is_unchanged_since_upload(
+                file_key, fingerprint
+            ):
+                # Nothing is uploaded, so nothing is logged to Timestream either
+                log.info(
+                    "Object (%s) - Unchanged since last upload, skipping", file_key
+                )
+                return
+
+            if event.action_type != "DELETE":
+                # Queue Slack Notification about the event
+                self._queue_slack_event(path)
 
                 # Generate Object Tags String
                 tags = self._generate_object_tags(
                     event=event,
+                    object_stats=object_stats,
                 )
 
                 # Upload to S3 Bucket
-                self._upload_to_s3_bucket(
-                    src_path=event.get_path(),
+                uploaded = self._upload_to_s3_bucket(
+                    src_path=path,
                     bucket_name=event.bucket_name,
-                    file_key=event.get_parsed_path(),
+                    file_key=file_key,
                     tags=tags,
                 )
 
-                # Send Slack Notification about the event
-                if self.slack_client is not None:
-                    try:
-                        if not is_file_manifest(event.get_path()):
-                            slack_message = generate_file_pipeline_message(
-                                event.get_path()
-                            )
-                            # Get ts of the slack message
-                            ts = get_message_ts(
-                                slack_client=self.slack_client,
-                                slack_channel=self.slack_channel,
-                                text=slack_message,  # Pass the message_ts instead of slack_message
-                            )
-
-                            action_type = "upload"
-                            slack_message = generate_file_pipeline_message(
-                                event.get_path(), alert_type=action_type
-                            )
-
-                            # Send Slack Notification about the event within thread
-                            send_slack_notification(
-                                slack_client=self.slack_client,
-                                slack_channel=self.slack_channel,
-                                slack_message=slack_message,
-                                alert_type=action_type,
-                                thread_ts=ts,
-                            )
-                    except Exception as e:
-                        log.error(e)
+                # Remember the fingerprint of the uploaded content and count it for the Slack summary
+                if uploaded:
+                    self._put_fingerprint(file_key, fingerprint)
+                    if not is_file_manifest(path):
+                        with self.slack_uploads_lock:
+                            self.slack_uploads += 1
+
+                # Otherwise retry the upload from the dead letter queue
+                else:
+                    self._add_to_dead_letter_queue(event, attempt + 1)
 
             elif event.action_type == "DELETE" and self.allow_delete:
+                # Forget the fingerprint so a recreated file is uploaded again
+                with self.fingerprints_lock:
+                    self.fingerprints.pop(file_key, None)
+
                 # Delete from S3 Bucket if allowed
                 self._delete_from_s3_bucket(
                     bucket_name=event.bucket_name,
-                    file_key=event.get_parsed_path(),
+                    file_key=file_key,
                 )
 
             # Log to Timestream
             if self.timestream_db and self.timestream_table:
-                timestream_log(
-                    boto3_session=self.boto3_session,
+                self._log_to_timestream(
                     action_type=event.action_type,
-                    file_key=event.get_path(),
-                    new_file_key=event.get_parsed_path(),
+                    file_key=path,
+                    new_file_key=file_key,
                     source_bucket="External Server",
                     destination_bucket=None
                     if event.action_type == "DELETE"
                     else event.bucket_name,
-                    timestream_db=self.timestream_db,
-                    timestream_table=self.timestream_table,
+                    file_size=fingerprint[0] if fingerprint is not None else 0,
                 )
 
-            # Remove the event from the list
-            self.events.remove(event)
-
         except Exception as e:
             log.error(e)
             log.error(
@@ -300,40 +617,201 @@ class FileSystemHandler(FileSystemEventHandler):
                 }
             )
 
+        finally:
+            # Handle any newer event for the path, even if handling this one failed
+            self._handle_next_event(event)
+
+    def _queue_slack_notification(self, function, *args, **kwargs) -> None:
+        """
+        Function to queue a Slack notification to be sent by the Slack worker thread
+        """
+        if self.slack_client is None:
+            return
+
+        self._put_slack_queue(self.slack_queue, (function, args, kwargs))
+
+    def _queue_slack_event(self, path: str) -> None:
+        """
+        Function to queue a file event to be posted in the next batch of Slack event notifications
+        """
+        if self.slack_client is None:
+            return
+
+        self._put_slack_queue(self.slack_event_paths, path)
+
+    def _put_slack_queue(self, queue: Queue, item) -> None:
+        """
+        Function to put an item on a Slack queue, dropping it if the queue is full
+        """
+        try:
+            queue.put_nowait(item)
+        except Full:
+            # Count under a lock, as the upload workers drop notifications concurrently
+            with self.slack_dropped_lock:
+                self.slack_dropped += 1
+                slack_dropped = self.slack_dropped
+
+            log.warning(
+                "Slack notification queue is full, %s notifications dropped",
+                slack_dropped,
+            )
+
+    @staticmethod
+    def _drain_queue(queue: Queue) -> list:
+        """
+        Function to take every item currently on a queue without blocking
+        """
+        items = []
+        while True:
+            try:
+                items.append(queue.get_nowait())
+            except Empty:
+                return items
+
+    def _slack_worker(self) -> None:
+        """
+        Function run by a background thread to send the queued Slack notifications once per batch interval
+        """
+        last_summary_time = time.time()
+        while True:
+            time.sleep(self.slack_batch_interval)
+            try:
+                # Post the file events queued since the last batch
+                self._send_slack_notification_for_events(
+                    self._drain_queue(self.slack_event_paths)
+                )
+
+                # Send the other queued notifications in order
+                for function, args, kwargs in self._drain_queue(self.slack_queue):
+                    try:
+                        function(*args, **kwargs)
+                    except Exception as e:
+                        log.error(e)
+
+                # Post the summary of uploads once per summary interval
+                if time.time() - last_summary_time >= self.slack_summary_interval:
+                    last_summary_time = time.time()
+                    self._send_slack_notification_for_uploads()
+
+            except Exception as e:
+                log.error(e)
+
+    def _send_slack_notification_for_events(self, paths: List[str]) -> None:
+        """
+        Function to send Slack notifications about file events, batching science files into one message per batch size
+        """
+        slack_messages = []
+        for path in paths:
+            slack_message = generate_file_pipeline_message(path)
+
+            # Manifest files carry their contents as an attachment so are sent on their own
+            if isinstance(slack_message, tuple):
+                send_slack_notification(
+                    slack_client=self.slack_client,
+                    slack_channel=self.slack_channel,
+                    slack_message=slack_message,
+                )
+            else:
+                slack_messages.append(slack_message)
+
+        for i in range(0, len(slack_messages), self.slack_batch_size):
+            send_slack_notification(
+                slack_client=self.slack_client,
+                slack_channel=self.slack_channel,
+                slack_message="\n".join(slack_messages[i : i + self.slack_batch_size]),
+            )
+
+    def _send_slack_notification_for_uploads(self) -> None:
+        """
+        Function to send a Slack notification summarizing the files uploaded since the last summary
+        """
+        with self.slack_uploads_lock:
+            uploads, self.slack_uploads = self.slack_uploads, 0
+
+        if uploads == 0:
+            return
+
+        send_slack_notification(
+            slack_client=self.slack_client,
+            slack_channel=self.slack_channel,
+            slack_message=f"FSWatcher: {uploads} files uploaded to S3 ({self.bucket_name}) in the last {round(self.slack_summary_interval / 60)} minutes",
+            alert_type="upload",
+        )
+
+    def _log_to_timestream(self, **kwargs) -> None:
+        """
+        Function to buffer a Timestream record for a file event, writing the buffer once it holds a full batch
+        """
+        record = generate_timestream_record(**kwargs)
+
+        with self.timestream_lock:
+            self.timestream_records.append(record)
+            if len(self.timestream_records) < TIMESTREAM_MAX_RECORDS:
+                return
+
+            records, self.timestream_records = self.timestream_records, []
+
+        self._write_timestream_records(records)
+
+    def _flush_timestream_records(self) -> None:
+        """
+        Function to write all buffered Timestream records
+        """
+        with self.timestream_lock:
+            records, self.timestream_records = self.timestream_records, []
+
+        if records:
+            self._write_timestream_records(records)
+
+    def _write_timestream_records(self, records: List[dict]) -> None:
+        """
+        Function to write Timestream records with the cached Timestream client
+        """
+        write_timestream_records(
+            timestream_client=self.timestream_client,
+            records=records,
+            timestream_db=self.timestream_db,
+            timestream_table=self.timestream_table,
+        )
+
+    def _timestream_worker(self) -> None:
+        """
+        Function run by a background thread to periodically flush the buffered Timestream records
+        """
+        while True:
+            time.sleep(self.timestream_flush_interval)
+            try:
+                self._flush_timestream_records()
+            except Exception as e:
+                log.error(e)
+
     @staticmethod
-    def _generate_object_tags(event: FileSystemHandlerEvent) -> str:
+    def _generate_object_tags(
+        event: FileSystemHandlerEvent, object_stats: os.stat_result
+    ) -> str:
         """
-        Function to generate object tags and return as a url encoded string
+        Function to generate object tags from the stats of the file and return as a url encoded string
         """
-        log.debug(f"Object ({event.get_parsed_path()}) - Generating S3 Object Tags")
+        parsed_path = event.get_parsed_path()
+        log.debug("Object (%s) - Generating S3 Object Tags", parsed_path)
         try:
-            # Get Object Stats
-            object_stats = os.stat(event.get_path())
-
-            stat_list = dir(object_stats)
-
-            tags = {}
-
-            # Create Tags Dictionary
-            for stat in stat_list:
-                if stat in [
-                    "st_mode",
-                    "st_ino",
-                    "st_uid",
-                    "st_gid",
-                    "st_size",
-                    "st_atime",
-                    "st_mtime",
-                    "st_ctime",
-                    "st_type",
-                    "st_creator",
-                ]:
-                    tags[stat] = object_stats.__getattribute__(stat)
+            # Create Tags String from the stat fields directly, keeping the float second timestamps
+            # downstream readers parse. Values are URL safe so no encoding is needed.
+            tags = (
+                f"st_mode={object_stats.st_mode}"
+                f"&st_ino={object_stats.st_ino}"
+                f"&st_uid={object_stats.st_uid}"
+                f"&st_gid={object_stats.st_gid}"
+                f"&st_size={object_stats.st_size}"
+                f"&st_atime={object_stats.st_atime}"
+                f"&st_mtime={object_stats.st_mtime}"
+                f"&st_ctime={object_stats.st_ctime}"
+            )
 
             # Log Object Creation and Modification Times
-            log.debug(f"Object ({event.get_parsed_path()}) - Stats: {tags}")
+            log.debug("Object (%s) - Stats: %s", parsed_path, tags)
 
-            return parse.urlencode(tags)
+            return tags
 
         except Exception as e:
             log.error(
@@ -342,25 +820,21 @@ class FileSystemHandler(FileSystemEventHandler):
 
     def _upload_to_s3_bucket(self, src_path, bucket_name, file_key, tags):
         """
-        Function to Upload a file to an S3 Bucket
+        Function to Upload a file to an S3 Bucket, returning whether it was uploaded
         """
-        log.debug(f"Object ({file_key}) - Uploading file to S3 Bucket ({bucket_name})")
+        log.debug(
+            "Object (%s) - Uploading file to S3 Bucket (%s)", file_key, bucket_name
+        )
 
         # If bucket name includes directories remove them from bucket_name and append to the file_key
-        if "/" in bucket_name:
-            bucket_name, folder = bucket_name.split("/", 1)
-            if folder != "" and folder[-1] != "/":
-                folder = f"{folder}/"
-            upload_file_key = f"{folder}{file_key}"
-        else:
-            upload_file_key = file_key
-            folder = ""
+        bucket_name, folder = self._split_bucket_name(bucket_name)
+        upload_file_key = f"{folder}{file_key}"
 
         try:
             # Upload to S3 Bucket
             # If time since self.last_refresh is greater than 15 minutes refresh the boto session
-            if time.time() - self.last_refresh_time >= 900:  # 900 seconds = 15 minutes
-                self._refresh_boto_session()
+            if time.time() - self.last_refresh_time >= self.session_max_age:
+                self._refresh_boto_session(max_age=self.session_max_age)
             self.s3t.upload_file(
                 src_path,
                 bucket_name,
@@ -371,65 +845,189 @@ class FileSystemHandler(FileSystemEventHandler):
             if folder != "" and folder[0] != "/":
                 folder = f"/{folder}"
             log.info(
-                f"Object ({file_key}) - Successfully Uploaded to S3 Bucket ({bucket_name}{folder})"
+                "Object (%s) - Successfully Uploaded to S3 Bucket (%s%s)",
+                file_key,
+                bucket_name,
+                folder,
             )
 
-        except boto3.exceptions.RetriesExceededError:
+            return True
+
+        except (
+            boto3.exceptions.S3UploadFailedError,
+            boto3.exceptions.RetriesExceededError,
+            botocore.exceptions.ConnectionError,
+        ) as e:
+            # S3Transfer wraps client errors (e.g. expired credentials) in S3UploadFailedError,
+            # so refresh the session before the upload is retried by the caller
             log.error(
                 {
                     "status": "ERROR",
-                    "message": f"Error uploading to S3 Bucket ({bucket_name}): Retries Exceeded",
+                    "message": f"Error uploading to S3 Bucket ({bucket_name}): {e}",
                 }
             )
-            time.sleep(5)
-            self.dead_letter_queue.append(
+            if isinstance(e, boto3.exceptions.S3UploadFailedError):
+                self._refresh_boto_session(max_age=self.min_refresh_interval)
+
+        return False
+
+    def _get_fingerprint(
+        self, file_key: str, path: str, object_stats: os.stat_result
+    ) -> Tuple[int, int, Optional[str]]:
+        """
+        Function to get the size, modification time and content digest of a file. The content is only hashed
+        when its last upload had the same size but a different modification time, so new files are read once.
+        Uploads of new or resized files store no digest, so the first touch after one is uploaded again,
+        storing the digest that later touches are compared with
+        """
+        with self.fingerprints_lock:
+            previous = self.fingerprints.get(file_key)
+
+        digest = None
+        if (
+            previous is not None
+            and previous[0] == object_stats.st_size
+            and previous[1] != object_stats.st_mtime_ns
+            and object_stats.st_size <= FINGERPRINT_MAX_SIZE
+        ):
+            file_hash = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(MB), b""):
+                    file_hash.update(chunk)
+            digest = file_hash.hexdigest()
+
+        return (object_stats.st_size, object_stats.st_mtime_ns, digest)
+
+    def _is_unchanged_since_upload(
+        self, file_key: str, fingerprint: Tuple[int, int, Optional[str]]
+    ) -> bool:
+        """
+        Function to check if a file matches the fingerprint of its last upload
+        """
+        with self.fingerprints_lock:
+            previous = self.fingerprints.get(file_key)
+
+        if previous is None or previous[0] != fingerprint[0]:
+            return False
+
+        # Same size and modification time, or only the modification time changed but the content is identical.
+        # Uploads of new or resized files store no digest, it is filled in by the next upload of the same size
+        return previous[1] == fingerprint[1] or (
+            fingerprint[2] is not None and previous[2] == fingerprint[2]
+        )
+
+    def _put_fingerprint(
+        self, file_key: str, fingerprint: Tuple[int, int, Optional[str]]
+    ) -> None:
+        """
+        Function to add a fingerprint to the fingerprints cache, evicting the oldest fingerprint when full
+        """
+        with self.fingerprints_lock:
+            self.fingerprints.pop(file_key, None)
+            if len(self.fingerprints) >= self.fingerprints_cache_size:
+                self.fingerprints.popitem(last=False)
+
+            self.fingerprints[file_key] = fingerprint
+
+    def _add_to_dead_letter_queue(
+        self, event: FileSystemHandlerEvent, attempt: int
+    ) -> None:
+        """
+        Function to schedule a failed upload to be retried with exponential backoff
+        """
+        file_key = event.get_parsed_path()
+        if attempt >= self.max_upload_attempts:
+            log.error(
                 {
-                    "src_path": src_path,
-                    "bucket_name": bucket_name,
-                    "file_key": file_key,
-                    "tags": tags,
+                    "status": "ERROR",
+                    "message": f"Object ({file_key}) - Giving up upload after {attempt} attempts",
                 }
             )
-            log.info(self.dead_letter_queue)
+            self._queue_slack_notification(
+                send_slack_notification,
+                slack_client=self.slack_client,
+                slack_channel=self.slack_channel,
+                slack_message=f"FSWatcher: Error uploading file to {event.bucket_name} - ({file_key}) :file_folder:",
+                alert_type="error",
+            )
+            return
 
-        except botocore.exceptions.ClientError as e:
-            self._refresh_boto_session()
-            log.error(
-                {"status": "ERROR", "message": f"Error uploading to S3 Bucket: {e}"}
+        backoff = min(60, 2**attempt)
+        log.info("Object (%s) - Retrying upload in %s seconds", file_key, backoff)
+
+        with self.dead_letter_condition:
+            heapq.heappush(
+                self.dead_letter_queue,
+                (
+                    time.time() + backoff,
+                    next(self.dead_letter_counter),
+                    attempt,
+                    event.get_path(),
+                ),
             )
+            self.dead_letter_condition.notify()
+
+    def _dead_letter_worker(self) -> None:
+        """
+        Function run by a background thread to re-dispatch uploads from the dead letter queue once their backoff expires.
+        Retries go through the worker pool like any other event, so they are serialized with newer events of their path
+        """
+        while True:
+            with self.dead_letter_condition:
+                # Wait for the earliest retry to become due
+                while True:
+                    if not self.dead_letter_queue:
+                        self.dead_letter_condition.wait()
+                        continue
+
+                    delay = self.dead_letter_queue[0][0] - time.time()
+                    if delay <= 0:
+                        break
+
+                    self.dead_letter_condition.wait(delay)
+
+                _, _, attempt, path = heapq.heappop(self.dead_letter_queue)
+
             try:
-                send_slack_notification(
-                    slack_client=self.slack_client,
-                    slack_channel=self.slack_channel,
-                    slack_message=f"FSWatcher: Error uploading file to {bucket_name} - ({file_key}) :file_folder:",
-                    alert_type="error",
-                )
+                self._dispatch_event(FileModifiedEvent(path), attempt)
             except Exception as e:
                 log.error(e)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _split_bucket_name(bucket_name: str) -> Tuple[str, str]:
+        """
+        Function to split a bucket name that includes directories into the bucket name and a folder prefix ending with a slash
+        """
+        bucket_name, _, folder = bucket_name.partition("/")
+        if folder != "" and folder[-1] != "/":
+            folder = f"{folder}/"
+
+        return bucket_name, folder
+
     def _delete_from_s3_bucket(self, bucket_name, file_key):
         """
         Function to delete a file from an S3 bucket
         """
         # If bucket name includes directories remove them from bucket_name and append to the file_key
-        if "/" in bucket_name:
-            bucket_name, folder = bucket_name.split("/", 1)
-            if folder != "" and folder[-1] != "/":
-                folder = f"{folder}/"
-            file_key = f"{folder}{file_key}"
+        bucket_name, folder = self._split_bucket_name(bucket_name)
+        file_key = f"{folder}{file_key}"
 
-        log.debug(f"Object ({file_key}) - Deleting file from S3 Bucket ({bucket_name})")
+        log.debug(
+            "Object (%s) - Deleting file from S3 Bucket (%s)", file_key, bucket_name
+        )
 
         try:
             if self.allow_delete:
-                if (
-                    time.time() - self.last_refresh_time >= 900
-                ):  # 900 seconds = 15 minutes
-                    self._refresh_boto_session()
+                # If time since self.last_refresh is greater than 15 minutes refresh the boto session
+                if time.time() - self.last_refresh_time >= self.session_max_age:
+                    self._refresh_boto_session(max_age=self.session_max_age)
                 self.s3_client.delete_object(Bucket=bucket_name, Key=file_key)
 
                 log.info(
-                    f"Object ({file_key}) - Successfully deleted from S3 Bucket ({bucket_name})"
+                    "Object (%s) - Successfully deleted from S3 Bucket (%s)",
+                    file_key,
+                    bucket_name,
                 )
         except botocore.exceptions.ClientError as e:
             log.error(
@@ -438,16 +1036,12 @@ class FileSystemHandler(FileSystemEventHandler):
 
     # Recursively get all file in the specified directory as a list with optional date filter (datetime) also print out how long it took to get the files and the number of files
     def _get_files(self, path, date_filter=None):
-        files = []
         start_time = time.time()
-        for root, _, file in os.walk(path):
-            for f in file:
-                file_path = os.path.join(root, f)
-                if date_filter:
-                    if self._check_date(file_path, date_filter):
-                        files.append(file_path)
-                else:
-                    files.append(file_path)
+
+        # Change date_filter from datetime to match modified time once, outside of the walk
+        timestamp = datetime.timestamp(date_filter) if date_filter else None
+
+        files = list(self._scan_files(path, timestamp))
 
         end_time = time.time()
         log.info(
@@ -458,30 +1052,115 @@ class FileSystemHandler(FileSystemEventHandler):
         if self.check_with_s3:
             log.info("Checking files with S3 (This may take a while) ...")
 
-            keys = self._get_s3_keys(bucket_name=self.bucket_name)
+            if self.check_s3_mode == "list":
+                keys = self._iter_s3_keys(bucket_name=self.bucket_name)
 
-            log.info("Now comparing files with S3 keys ...")
+                log.info("Now comparing files with S3 keys ...")
 
-            # Remove files that are already in S3
-            files = list(set(files) - set(keys))
+                # Remove files that are already in S3
+                files = self._compare_files_with_s3_keys(files, keys)
+            else:
+                # Probe S3 only for the local files instead of listing the whole bucket
+                files = self._missing_in_s3(files)
             # Log the first 10 files
             log.info(f"First 10 files: {files[:10]}")
 
-            # Log the first 10 keys
-            log.info(f"First 10 keys: {keys[:10]}")
             # Log the number of files that are not in S3
             log.info(f"Found {len(files)} files that are not in S3")
 
         return files
 
-    # Check if the file is newer than the date filter
-    def _check_date(self, file, date_filter):
-        # Change date_filter from datetime to match modified time
-        date_filter = datetime.timestamp(date_filter)
+    # Return the files that are not in S3, probing each directory concurrently with a prefix listing (many files) or head requests (few files)
+    def _missing_in_s3(self, files):
+        start_time = time.time()
 
-        if os.path.getmtime(file) > date_filter:
-            return True
-        return False
+        # If bucket name includes directories remove them from bucket_name and append to the file_key
+        bucket_name, folder = self._split_bucket_name(self.bucket_name)
+
+        # Group the files by the S3 prefix of their directory
+        groups = {}
+        for file in files:
+            file_key = f"{folder}{self._get_file_key(file)}"
+            prefix = file_key.rsplit("/", 1)[0] + "/" if "/" in file_key else ""
+            groups.setdefault(prefix, []).append((file, file_key))
+
+        missing = []
+        with ThreadPoolExecutor(max_workers=self.concurrency_limit) as pool:
+            for group_missing in pool.map(
+                lambda item: self._missing_in_s3_prefix(bucket_name, *item),
+                groups.items(),
+            ):
+                missing.extend(group_missing)
+
+        end_time = time.time()
+        log.info(
+            f"Checked {len(files)} files with S3 in {round(end_time - start_time, 2)} seconds"
+        )
+        return missing
+
+    # Return the files of a single S3 prefix that are not in S3
+    def _missing_in_s3_prefix(self, bucket_name, prefix, group):
+        s3_client = self.s3_client
+
+        # List the prefix once when it is cheaper than probing every file
+        if len(group) > self.list_prefix_threshold:
+            paginator = s3_client.get_paginator("list_objects_v2")
+            keys = set()
+            for page in paginator.paginate(
+                Bucket=bucket_name, Prefix=prefix, Delimiter="/"
+            ):
+                for obj in page.get("Contents", []):
+                    keys.add(obj["Key"])
+            return [file for file, file_key in group if file_key not in keys]
+
+        missing = []
+        for file, file_key in group:
+            try:
+                s3_client.head_object(Bucket=bucket_name, Key=file_key)
+            except botocore.exceptions.ClientError as e:
+                if e.response["Error"]["Code"] not in ("404", "NoSuchKey"):
+                    log.warning("Object (%s) - Unable to check S3: %s", file_key, e)
+                missing.append(file)
+        return missing
+
+    # Return the files that are not in the S3 keys, only the S3 keys are held in a set
+    @staticmethod
+    def _compare_files_with_s3_keys(files, s3_keys_iter):
+        s3_keys = set(s3_keys_iter)
+        return [file for file in files if file not in s3_keys]
+
+    # Recursively yield every file in the directory tree modified after the timestamp (if provided), reusing the stat cached on each directory entry
+    def _scan_files(self, path, timestamp=None):
+        # Walk the tree with an explicit stack of directories, so deep trees neither hit the
+        # recursion limit nor pass every file up through a chain of nested generators
+        directories = [path]
+        while directories:
+            directory = directories.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                log.debug("Unable to scan directory %s: %s", directory, e)
+                continue
+
+            with entries:
+                yield from self._scan_entries(entries, directories, timestamp)
+
+    # Yield the files of a scanned directory modified after the timestamp (if provided), adding its subdirectories to the stack
+    def _scan_entries(self, entries, directories, timestamp=None):
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file() and (
+                    timestamp is None or entry.stat().st_mtime > timestamp
+                ):
+                    yield entry.path
+            except OSError as e:
+                log.debug("Unable to stat %s: %s", entry.path, e)
+
+    # Get the file key of a file relative to the watch path
+    def _get_file_key(self, path):
+        return os.path.relpath(path, self.path)
 
     # Go through the list of files and check if they are in the S3 bucket
     def _check_files(self, files, bucket_name):
@@ -518,20 +1197,13 @@ class FileSystemHandler(FileSystemEventHandler):
     def backtrack(self, path, date_filter=None):
         self._dispatch_events(self._get_files(path, date_filter))
 
-    # Get all of the keys in an S3 bucket and return them as a list also support pagination if required, use s3 client instead of s3t because s3t does not support pagination
-    def _get_s3_keys(self, bucket_name):
-        keys = []
-        start_time = time.time()
+    # Lazily yield all of the keys in an S3 bucket page by page, so callers can consume them without buffering the whole listing
+    def _iter_s3_keys(self, bucket_name):
         self._refresh_boto_session()
         s3 = self.boto3_session.client("s3")
         paginator = s3.get_paginator("list_objects_v2")
         # If bucket name includes directories remove them from bucket_name and append to the file_key
-        if "/" in bucket_name:
-            bucket_name, folder = bucket_name.split("/", 1)
-            if folder != "" and folder[-1] != "/":
-                folder = f"{folder}/"
-        else:
-            folder = ""
+        bucket_name, folder = self._split_bucket_name(bucket_name)
 
         operation_parameters = {"Bucket": bucket_name, "Prefix": folder}
         page_iterator = paginator.paginate(**operation_parameters)
@@ -539,10 +1211,7 @@ class FileSystemHandler(FileSystemEventHandler):
         for page in page_iterator:
             if "Contents" in page:
                 for obj in page["Contents"]:
-                    keys.append(f'/watch/{obj["Key"].replace(folder, "")}')
-        end_time = time.time()
-        log.info(f"Found {len(keys)} keys in {round(end_time - start_time, 2)} seconds")
-        return keys
+                    yield f'/watch/{obj["Key"].replace(folder, "")}'
 
     def parse_datetime(self, date_string):
         if date_string is None or date_string == "":
@@ -568,7 +1237,7 @@ class FileSystemHandler(FileSystemEventHandler):
             f.write("This is a test file")
 
         # Generate tags
-        tags = self._generate_object_tags(file_system_event)
+        tags = self._generate_object_tags(file_system_event, os.stat(test_file))
 
         # Upload the file to S3
         self._upload_to_s3_bucket(
@@ -579,15 +1248,8 @@ class FileSystemHandler(FileSystemEventHandler):
         )
 
         # If bucket name includes directories remove them from bucket_name and append to the file_key
-        if "/" in self.bucket_name:
-            bucket_name, folder = self.bucket_name.split("/", 1)
-            if folder != "" and folder[-1] != "/":
-                folder = f"{folder}/"
-            file_key = f"{folder}{test_filename}"
-        else:
-            bucket_name = self.bucket_name
-            file_key = test_filename
-            folder = ""
+        bucket_name, folder = self._split_bucket_name(self.bucket_name)
+        file_key = f"{folder}{test_filename}"
 
         # Wait for the file to be deleted
         log.info("Waiting for file to be added...")
@@ -665,43 +1327,139 @@ class FileSystemHandler(FileSystemEventHandler):
             return False
         return True
 
-    def walk_directory_find(
-        self, path, excluded_files=None, excluded_exts=None, within_timestamp=None
+    def walk_directory(
+        self, path, excluded_files=None, excluded_exts=None, previous_files=None
     ):
-        all_files = []
-        find_command = ["find", path, "-type", "f", "-not", "-path", "'*/\.*'"]
-        if within_timestamp:
-            find_command += [
-                "-newermt",
-                within_timestamp,
-            ]
-        result = subprocess.run(find_command, stdout=subprocess.PIPE)
-        output_lines = result.stdout.decode().splitlines()
+        """
+        Function to walk a directory tree, returning the modification time of every file by path.
+        Directories are scanned in parallel by a thread pool, as scandir and stat release the GIL.
+        Entries that can't be read are carried over from previous_files, the result of the last walk
+        """
+        # Build the exclusion sets once for the whole walk
+        excluded_files = frozenset(excluded_files or ())
+        excluded_exts = frozenset(excluded_exts or ())
+        previous_files = previous_files or {}
+
+        files = {}
+        with ThreadPoolExecutor(
+            max_workers=self.walk_workers, thread_name_prefix="fswatcher-walk"
+        ) as pool:
+            pending = {
+                pool.submit(
+                    self._scan_directory,
+                    path,
+                    excluded_files,
+                    excluded_exts,
+                    previous_files,
+                )
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory_files, directories = future.result()
+                    files.update(directory_files)
+
+                    # Queue the subdirectories to be scanned by the next free worker
+                    pending.update(
+                        pool.submit(
+                            self._scan_directory,
+                            directory,
+                            excluded_files,
+                            excluded_exts,
+                            previous_files,
+                        )
+                        for directory in directories
+                    )
 
-        for file_path in output_lines:
-            if (excluded_files and file_path in excluded_files) or (
-                excluded_exts and os.path.splitext(file_path)[1] in excluded_exts
-            ):
-                continue
+        return files
 
-            try:
-                all_files.append((file_path))
-            except FileNotFoundError:
-                log.info(f"File {file_path} not found")
+    @staticmethod
+    def _previous_entries(previous_files, path):
+        """
+        Function to get the entries of the last walk at or below a path, to carry over when the path can't be read
+        """
+        if path in previous_files:
+            return {path: previous_files[path]}
+
+        prefix = path.rstrip(os.sep) + os.sep
+        return {
+            file_path: mtime
+            for file_path, mtime in previous_files.items()
+            if file_path.startswith(prefix)
+        }
 
-        return set(all_files)
+    def _scan_directory(
+        self,
+        directory,
+        excluded_files=frozenset(),
+        excluded_exts=frozenset(),
+        previous_files=None,
+    ):
+        """
+        Function to scan a single directory with os.scandir, returning the modification time of its files by path and its subdirectories
+        """
+        # Skip the exclusion checks entirely when nothing is excluded
+        has_exclusions = bool(excluded_files or excluded_exts)
+        previous_files = previous_files or {}
+
+        files = {}
+        directories = []
+        try:
+            # Scan through a directory file descriptor, so each file is stat'ed relative to it
+            # with fstatat instead of resolving its full path from the root again
+            directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            log.debug("Directory %s not found", directory)
+            return files, directories
+        except OSError as e:
+            # Keep the last walk's entries so files under an unreadable directory aren't seen as deleted
+            log.warning("Unable to scan directory %s: %s", directory, e)
+            return self._previous_entries(previous_files, directory), directories
+
+        try:
+            with os.scandir(directory_fd) as entries:
+                for entry in entries:
+                    path = os.path.join(directory, entry.name)
+                    try:
+                        # Directory and file checks use the type cached from the directory listing
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(path)
+                            continue
+
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+
+                        if has_exclusions and (
+                            path in excluded_files
+                            or os.path.splitext(entry.name)[1] in excluded_exts
+                        ):
+                            continue
+
+                        files[path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                    except FileNotFoundError:
+                        log.info("File %s not found", path)
+                    except OSError as e:
+                        # Skip only this entry, keeping its last known modification time
+                        log.warning("Unable to stat %s: %s", path, e)
+                        files.update(self._previous_entries(previous_files, path))
+        except OSError as e:
+            # The listing failed part way, so keep the last walk's entries for the whole directory
+            log.warning("Unable to scan directory %s: %s", directory, e)
+            return self._previous_entries(previous_files, directory), []
+        finally:
+            os.close(directory_fd)
+
+        return files, directories
 
     def fallback_directory_watcher(self):
         path = "/watch"
 
-        last_run_timestamp_str = None
-
         # Initialize excluded_files and excluded_exts as empty lists
         excluded_files = []
         excluded_exts = []
         if self.check_with_s3:
             log.info("Checking S3 bucket for existing files...")
-            s3_set = set(self._get_s3_keys(self.bucket_name))
+            s3_set = set(self._iter_s3_keys(self.bucket_name))
             log.info(
                 f"Found {len(s3_set)} files in S3 bucket. Adding to db of existing files..."
             )
@@ -715,15 +1473,15 @@ class FileSystemHandler(FileSystemEventHandler):
         log.info("Get initial Files")
         start = time.time()
 
-        # Get list of all files in directory
-        all_files = self.walk_directory_find(
+        # Get the modification time of all files in directory
+        all_files = self.walk_directory(
             path, excluded_files=excluded_files, excluded_exts=excluded_exts
         )
 
         if self.check_with_s3:
-            new_files, deleted_files = self.process_files(all_files, s3_set)
+            new_files, deleted_files = self.process_files(all_files.keys(), s3_set)
         else:
-            new_files, deleted_files = self.process_files(all_files, set())
+            new_files, deleted_files = self.process_files(all_files.keys(), set())
 
         deleted_files = []
 
@@ -740,67 +1498,127 @@ class FileSystemHandler(FileSystemEventHandler):
 
         # Loop starts
         while True:
-            if last_run_timestamp_str:
-                # Get list of all files in directory
-                modified_files = self.walk_directory_find(
-                    path,
-                    excluded_files=excluded_files,
-                    excluded_exts=excluded_exts,
-                    within_timestamp=last_run_timestamp_str,
-                )
-            else:
-                modified_files = set()
-
-            # Get list of all files in directory
-            files = self.walk_directory_find(
+            # Walk the directory once, comparing with the previous walk to find new, modified and deleted files
+            files = self.walk_directory(
                 path,
                 excluded_files=excluded_files,
                 excluded_exts=excluded_exts,
+                previous_files=all_files,
             )
-            new_files, deleted_files = self.process_files(files, all_files)
+            # New and modified files have no or a different modification time in the previous walk,
+            # and deleted files are the paths missing from this walk
+            new_files = [
+                file_path
+                for file_path, mtime in files.items()
+                if all_files.get(file_path) != mtime
+            ]
+            deleted_files = all_files.keys() - files.keys()
+            self._dispatch_events(new_files, deleted_files)
 
-            # Add modified files to new_files set
-            new_files = new_files.union(modified_files)
-            timestamp = int(time.time())
-            last_run_timestamp_str = time.strftime(
-                "%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)
-            )
-            self._dispatch_events(list(new_files), deleted_files)
-            # Remove deleted files from all_files
-            all_files = all_files - deleted_files
-            # Add new files to all_files
-            all_files = all_files.union(new_files)
+            # Keep this walk to compare with the next one
+            all_files = files
 
             # Sleep for 5 seconds
             time.sleep(5)
 
-    def _refresh_boto_session(self):
+    def _get_botocore_config(self) -> botocore.config.Config:
+        """
+        Function to get the botocore config used by the S3 client
+        """
+        return botocore.config.Config(
+            # Uploads share the transfer manager's max_concurrency threads, while deletes and
+            # S3 checks run on the worker pools, so size the pool for both to avoid reconnects
+            max_pool_connections=max(self.concurrency_limit * 2, 50),
+            tcp_keepalive=True,
+            signature_version="s3v4",
+            retries={"max_attempts": 10, "mode": "adaptive"},
+            # Request parameters come from the handler rather than user input, so skip validating them on every call
+            parameter_validation=False,
+            s3={
+                # Uploads go over HTTPS so skip the per-chunk SHA-256 of the payload
+                "payload_signing_enabled": False,
+                "use_accelerate_endpoint": self.config.use_accelerate,
+            },
+        )
+
+    def _get_transfer_config(self, **kwargs) -> TransferConfig:
+        """
+        Function to get the transfer config used by the S3 Transfer Manager
+        """
+        return TransferConfig(
+            use_threads=True,
+            max_concurrency=self.concurrency_limit,
+            multipart_threshold=self.config.multipart_threshold * MB,
+            multipart_chunksize=self.config.multipart_chunksize * MB,
+            max_io_queue=self.config.max_io_queue,
+            io_chunksize=self.config.io_chunksize * MB,
+            **kwargs,
+        )
+
+    def _get_s3_transfer(self) -> S3Transfer:
+        """
+        Function to get the S3 Transfer Manager, backed by the CRT transfer client when enabled and available
+        """
+        if self.config.use_crt and HAS_CRT:
+            transfer_config = self._get_transfer_config(preferred_transfer_client="crt")
+            return S3Transfer(
+                manager=create_transfer_manager(self.s3_client, transfer_config)
+            )
+
+        return S3Transfer(self.s3_client, self._get_transfer_config())
+
+    def _get_timestream_client(self):
+        """
+        Function to get the Timestream write client, only created when a Timestream database and table are configured
+        """
+        if not (self.config.timestream_db and self.config.timestream_table):
+            return None
+
+        return self.boto3_session.client("timestream-write")
+
+    def _refresh_boto_session(self, max_age: float = 0.0):
+        """
+        Function to rebuild the boto3 session and its clients, unless another thread already did within max_age seconds.
+        The replaced S3 Transfer Manager is kept until the next refresh, so uploads that already picked it up can finish
+        """
         config = self.config
-        try:
-            self.boto3_session = (
-                boto3.session.Session(
-                    profile_name=config.profile, region_name=self.config.aws_region
+        with self.refresh_lock:
+            # Re-check inside the lock, another worker may have refreshed while this one waited
+            if time.time() - self.last_refresh_time < max_age:
+                return
+
+            try:
+                self.boto3_session = (
+                    boto3.session.Session(
+                        profile_name=config.profile, region_name=self.config.aws_region
+                    )
+                    if config.profile != ""
+                    else boto3.session.Session(region_name=self.config.aws_region)
                 )
-                if config.profile != ""
-                else boto3.session.Session(region_name=self.config.aws_region)
-            )
-            botocore_config = botocore.config.Config(
-                max_pool_connections=self.concurrency_limit
-            )
-            self.s3_client = self.boto3_session.client("s3", config=botocore_config)
-            transfer_config = TransferConfig(
-                use_threads=True,
-                max_concurrency=self.concurrency_limit,
-            )
-            self.s3t = S3Transfer(self.s3_client, transfer_config)
-            self.last_refresh_time = time.time()
-        except botocore.exceptions.ClientError as e:
-            error_code = int(e.response["Error"]["Code"])
-            if error_code == 404:
-                log.error(
-                    {
-                        "status": "ERROR",
-                        "message": f"Bucket ({config.bucket_name}) does not exist",
-                    }
+                self.s3_client = self.boto3_session.client(
+                    "s3", config=self._get_botocore_config()
                 )
-                sys.exit(1)
+                previous_s3t, self.s3t = self.s3t, self._get_s3_transfer()
+                self.timestream_client = self._get_timestream_client()
+                self.last_refresh_time = time.time()
+
+                # Shut down the Transfer Manager retired on the previous refresh in the background, it waits
+                # for its remaining uploads to finish so its threads are not leaked
+                if self.retired_s3t is not None:
+                    Thread(
+                        target=self.retired_s3t.__exit__,
+                        args=(None, None, None),
+                        name="fswatcher-s3-shutdown",
+                        daemon=True,
+                    ).start()
+                self.retired_s3t = previous_s3t
+            except botocore.exceptions.ClientError as e:
+                error_code = int(e.response["Error"]["Code"])
+                if error_code == 404:
+                    log.error(
+                        {
+                            "status": "ERROR",
+                            "message": f"Bucket ({config.bucket_name}) does not exist",
+                        }
+                    )
+                    sys.exit(1)
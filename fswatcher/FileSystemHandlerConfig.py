@@ -3,58 +3,45 @@ File System Handler Configuration Module
 """
 
 from argparse import ArgumentParser
+from dataclasses import dataclass, field
 
 import logging
 
 log = logging.getLogger(__name__)
 
 
+@dataclass
 class FileSystemHandlerConfig:
     """
     Dataclass to hold the FileSystemHandler Configuration
     """
 
-    def __init__(
-        self,
-        path: str,
-        bucket_name: str,
-        timestream_db: str = "",
-        timestream_table: str = "",
-        profile: str = "",
-        concurrency_limit: int = 20,
-        allow_delete: bool = False,
-        slack_token: str = "",
-        slack_channel: str = "",
-        backtrack: bool = False,
-        backtrack_date: str = "",
-        use_fallback: bool = False,
-        file_logging: bool = False,
-        boto3_logging: bool = False,
-        test_iam_policy: bool = False,
-        check_s3: bool = False,
-        aws_region: str = "us-east-1",
-    ) -> None:
-        """
-        Class Constructor
-        """
-
-        self.path = path
-        self.bucket_name = bucket_name
-        self.timestream_db = timestream_db
-        self.timestream_table = timestream_table
-        self.profile = profile
-        self.concurrency_limit = concurrency_limit
-        self.allow_delete = allow_delete
-        self.slack_token = slack_token
-        self.slack_channel = slack_channel
-        self.backtrack = backtrack
-        self.backtrack_date = backtrack_date
-        self.use_fallback = use_fallback
-        self.file_logging = file_logging
-        self.boto3_logging = boto3_logging
-        self.test_iam_policy = test_iam_policy
-        self.check_s3 = check_s3
-        self.aws_region = aws_region
+    path: str
+    bucket_name: str
+    timestream_db: str = ""
+    timestream_table: str = ""
+    profile: str = ""
+    concurrency_limit: int = 20
+    allow_delete: bool = False
+    slack_token: str = field(default="", repr=False)
+    slack_channel: str = ""
+    backtrack: bool = False
+    backtrack_date: str = ""
+    use_fallback: bool = False
+    file_logging: bool = False
+    boto3_logging: bool = False
+    test_iam_policy: bool = False
+    check_s3: bool = False
+    check_s3_mode: str = "head"
+    aws_region: str = "us-east-1"
+    multipart_threshold: int = 64
+    multipart_chunksize: int = 64
+    max_io_queue: int = 1000
+    io_chunksize: int = 1
+    use_accelerate: bool = False
+    poll_interval: int = 60
+    use_crt: bool = False
+    raise_inotify_limit: bool = False
 
 
 def create_argparse() -> ArgumentParser:
@@ -169,6 +156,15 @@ def create_argparse() -> ArgumentParser:
         help="Check S3 Bucket Flag for the File System Watcher",
     )
 
+    # Add Argument to parse the check S3 bucket mode
+    parser.add_argument(
+        "-csm",
+        "--check_s3_mode",
+        choices=["head", "list"],
+        default="head",
+        help="Check S3 Bucket Mode, head probes each file while list lists the whole bucket",
+    )
+
     # Add Argument to parse the AWS region
     parser.add_argument(
         "-ar",
@@ -176,6 +172,75 @@ def create_argparse() -> ArgumentParser:
         help="AWS Region for the File System Watcher",
     )
 
+    # Add Argument to parse the multipart upload threshold
+    parser.add_argument(
+        "-mt",
+        "--multipart_threshold",
+        type=int,
+        default=64,
+        help="Size in MB above which files are uploaded to S3 in multiple parts",
+    )
+
+    # Add Argument to parse the multipart upload chunk size
+    parser.add_argument(
+        "-mc",
+        "--multipart_chunksize",
+        type=int,
+        default=64,
+        help="Size in MB of each part of a multipart upload to S3",
+    )
+
+    # Add Argument to parse the max IO queue size
+    parser.add_argument(
+        "-mq",
+        "--max_io_queue",
+        type=int,
+        default=1000,
+        help="Maximum number of read parts queued in memory to be uploaded to S3",
+    )
+
+    # Add Argument to parse the IO chunk size
+    parser.add_argument(
+        "-ic",
+        "--io_chunksize",
+        type=int,
+        default=1,
+        help="Size in MB of each read from a file being uploaded to S3",
+    )
+
+    # Add Argument to parse the S3 transfer acceleration flag
+    parser.add_argument(
+        "-ua",
+        "--use_accelerate",
+        action="store_true",
+        help="Use the S3 Transfer Acceleration endpoint for the File System Watcher",
+    )
+
+    # Add Argument to parse the polling interval used for network filesystems
+    parser.add_argument(
+        "-pi",
+        "--poll_interval",
+        type=int,
+        default=60,
+        help="Polling Interval in seconds for directories on network filesystems (NFS/CIFS/SMB)",
+    )
+
+    # Add Argument to parse the CRT transfer client flag
+    parser.add_argument(
+        "-uc",
+        "--use_crt",
+        action="store_true",
+        help="Use the AWS Common Runtime (CRT) S3 transfer client for uploads, requires boto3[crt]",
+    )
+
+    # Add Argument to parse the raise inotify limit flag
+    parser.add_argument(
+        "-ril",
+        "--raise_inotify_limit",
+        action="store_true",
+        help="Raise the host wide inotify watch limit (fs.inotify.max_user_watches) if it is reached, requires privileges",
+    )
+
     # Return the Argument Parser
     return parser
 
@@ -210,7 +275,16 @@ def parse_args(parser: ArgumentParser) -> dict:
         "boto3_logging": args.boto3_logging,
         "test_iam_policy": args.test_iam_policy,
         "check_s3": args.check_s3,
+        "check_s3_mode": args.check_s3_mode,
         "aws_region": args.aws_region,
+        "multipart_threshold": args.multipart_threshold,
+        "multipart_chunksize": args.multipart_chunksize,
+        "max_io_queue": args.max_io_queue,
+        "io_chunksize": args.io_chunksize,
+        "use_accelerate": args.use_accelerate,
+        "poll_interval": args.poll_interval,
+        "use_crt": args.use_crt,
+        "raise_inotify_limit": args.raise_inotify_limit,
     }
 
     # Return the arguments dictionary
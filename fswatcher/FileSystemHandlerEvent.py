@@ -2,14 +2,23 @@
 File System Handler Event Module
 """
 
+from typing import Optional
 from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
     FileSystemEvent,
-    FileCreatedEvent,
-    FileModifiedEvent,
-    FileMovedEvent,
-    FileDeletedEvent,
 )
 
+# Action types of the watchdog file event types
+ACTION_TYPES = {
+    EVENT_TYPE_CREATED: "CREATE",
+    EVENT_TYPE_MODIFIED: "UPDATE",
+    EVENT_TYPE_MOVED: "PUT",
+    EVENT_TYPE_DELETED: "DELETE",
+}
+
 
 class FileSystemHandlerEvent:
     """
@@ -23,6 +32,7 @@ class FileSystemHandlerEvent:
     dest_path: str = ""
     action_type: str = ""
     completed: bool = False
+    _parsed_path: Optional[str] = None
 
     def __init__(
         self, event: FileSystemEvent, bucket_name: str, watch_path: str
@@ -39,25 +49,14 @@ class FileSystemHandlerEvent:
         # Set the Bucket Name
         self.bucket_name = bucket_name
 
-        # Handle File Creation Event if it is a FileCreatedEvent
-        if isinstance(event, FileCreatedEvent):
-            self.action_type = "CREATE"
-
-        # Handle File Modification Event
-        elif isinstance(event, FileModifiedEvent):
-            self.action_type = "UPDATE"
-
-        # Handle File Move Event
-        elif isinstance(event, FileMovedEvent):
-            self.action_type = "PUT"
+        # Look up the Action Type of the file event, directory events have none
+        if not event.is_directory:
+            self.action_type = ACTION_TYPES.get(event.event_type, "")
 
-            # Set the Destination Path
+        # Set the Destination Path if it is a File Move Event
+        if self.action_type == "PUT":
             self.dest_path = event.dest_path
 
-        # Handle File Deletion Event
-        elif isinstance(event, FileDeletedEvent):
-            self.action_type = "DELETE"
-
     # String Representation of the Class
     def __repr__(self) -> str:
         """
@@ -74,7 +73,7 @@ class FileSystemHandlerEvent:
 
         # Check if the other object is of the same type
         if not isinstance(other, FileSystemHandlerEvent):
-            raise ValueError("The other object is not of the same type")
+            return NotImplemented
 
         # Check if the Source Path, Bucket Name, Destination Path and Action Type are the same
         return (
@@ -84,6 +83,14 @@ class FileSystemHandlerEvent:
             and self.action_type == other.action_type
         )
 
+    # Hash Function
+    def __hash__(self) -> int:
+        """
+        Hash Function, consistent with the Comparison Function
+        """
+
+        return hash((self.src_path, self.bucket_name, self.dest_path, self.action_type))
+
     def get_log_message(self) -> str:
         """
         Function to get the log message
@@ -117,17 +124,16 @@ class FileSystemHandlerEvent:
     # Function to get the parsed Source Path
     def get_parsed_path(self) -> str:
         """
-        Function to return parsed src path
+        Function to return parsed src path, computed once and cached
         """
-        path = self.get_path()
-
-        # Strip first occurence of watch_path from src_path by splitting on the path by src_path
-        parsed_src_path = path.split(self.watch_path, 1)
+        if self._parsed_path is None:
+            self._parsed_path = self._parse_path()
 
-        merged_path = "".join(parsed_src_path)
+        return self._parsed_path
 
-        # Strip the first slash from the path
-        if merged_path[0] == "/":
-            merged_path = merged_path[1:]
-
-        return merged_path
+    def _parse_path(self) -> str:
+        """
+        Function to parse the path relative to the watch path
+        """
+        # Strip the watch_path prefix and the leading slash from the path
+        return self.get_path().removeprefix(self.watch_path).lstrip("/")
@@ -1,8 +1,9 @@
 import os
 import logging
+from logging.handlers import RotatingFileHandler
 import time
-from datetime import datetime
 from typing import Optional
+import botocore
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from fswatcher.FileSystemHandlerConfig import get_config
@@ -21,7 +22,10 @@ log = logging.getLogger(__name__)
 # Create log file handler if file log environment variable is set
 if config.file_logging == True:
     log.info("File logging enabled")
-    file_handler = logging.FileHandler("logs/fswatcher.log")
+    # Rotate the log file so it cannot grow without bound
+    file_handler = RotatingFileHandler(
+        "logs/fswatcher.log", maxBytes=50 * 1024 * 1024, backupCount=3
+    )
     file_handler.setLevel(logging.INFO)
 
     # Create formatter and add it to the handlers
@@ -39,6 +43,34 @@ if config.boto3_logging == True:
     boto3_log = logging.getLogger("botocore")
     boto3_log.setLevel(logging.DEBUG)
 
+# Otherwise keep the AWS SDK loggers quiet so their per request logging is filtered early
+else:
+    for logger_name in ("boto3", "botocore", "s3transfer", "urllib3"):
+        logging.getLogger(logger_name).setLevel(logging.WARNING)
+
+# Maximum number of records per Timestream write request
+TIMESTREAM_MAX_RECORDS = 100
+
+# Slack pipeline alert messages by alert type, formatted with the file path
+SLACK_ALERT_MESSAGES = {
+    "upload": "File Uploaded to S3 - ( _{}_ )",
+    "error": "File Upload Failed - ( _{}_ )",
+}
+
+# Slack attachment colors by alert type
+SLACK_COLORS = {
+    "success": "#2ecc71",
+    "error": "#ff0000",
+    "delete": "#ff0000",
+    "upload": "#3498db",
+    "info": "#3498db",
+    "warning": "#f1c40f",
+    "orange": "#f39c12",
+    "purple": "#9b59b6",
+    "black": "#000000",
+    "white": "#ffffff",
+}
+
 
 def is_file_manifest(file_name: str) -> bool:
     """
@@ -65,12 +97,8 @@ def generate_file_pipeline_message(
 
     # Remove the watch/ prefix from the file path
     parsed_file_path = file_path.replace("/watch/", "")
-    if alert_type is not "delete":
+    if alert_type != "delete":
         # Get the file name
-        alert = {
-            "upload": f"File Uploaded to S3 - ( _{parsed_file_path}_ )",
-            "error": f"File Upload Failed - ( _{parsed_file_path}_ )",
-        }
         slack_message = f"Science File - ( _{parsed_file_path}_ )"
 
         if is_file_manifest(file_path):
@@ -81,7 +109,7 @@ def generate_file_pipeline_message(
             return (slack_message, secondary_message)
 
         if alert_type:
-            slack_message = alert[alert_type]
+            slack_message = SLACK_ALERT_MESSAGES[alert_type].format(parsed_file_path)
         return slack_message
     else:
         slack_message = "File Deleted - ( _{parsed_file_path}_ )"
@@ -125,27 +153,14 @@ def send_slack_notification(
     thread_ts: Optional[str] = None,
 ) -> bool:
     log.debug(f"Sending Slack Notification to {slack_channel}")
-    color = {
-        "success": "#2ecc71",
-        "error": "#ff0000",
-        "delete": "#ff0000",
-        "upload": "#3498db",
-        "info": "#3498db",
-        "warning": "#f1c40f",
-        "orange": "#f39c12",
-        "purple": "#9b59b6",
-        "black": "#000000",
-        "white": "#ffffff",
-    }
-    ct = datetime.now()
-    ts = ct.strftime("%y-%m-%d %H:%M:%S")
+    ts = time.strftime("%y-%m-%d %H:%M:%S")
     attachments = []
     # Check if slack_message is a tuple
     if isinstance(slack_message, tuple):
         text = slack_message[0]
         attachments = [
             {
-                "color": color["purple"],
+                "color": SLACK_COLORS["purple"],
                 "blocks": [
                     {
                         "type": "section",
@@ -165,7 +180,7 @@ def send_slack_notification(
         if alert_type:
             attachments = [
                 {
-                    "color": color[alert_type],
+                    "color": SLACK_COLORS[alert_type],
                     "blocks": [
                         {
                             "type": "section",
@@ -177,7 +192,7 @@ def send_slack_notification(
                     ],
                 }
             ]
-            text = f'`{ts}` -'
+            text = f"`{ts}` -"
 
     for i in range(slack_max_retries):
         try:
@@ -230,67 +245,109 @@ def get_message_ts(
         return None
 
 
-def timestream_log(
-    boto3_session,
+def generate_timestream_record(
     action_type,
     file_key,
     new_file_key=None,
     source_bucket=None,
     destination_bucket=None,
+    file_size=0,
+) -> dict:
+    """
+    Function to generate a Timestream record for a file event, measuring the size of the file
+    """
+    if not source_bucket and not destination_bucket:
+        raise ValueError("A Source or Destination Buckets is required")
+
+    return {
+        "Time": str(time.time_ns() // 1_000_000),
+        "Dimensions": [
+            {"Name": "action_type", "Value": action_type},
+            {
+                "Name": "source_bucket",
+                "Value": source_bucket or "N/A",
+            },
+            {
+                "Name": "destination_bucket",
+                "Value": destination_bucket or "N/A",
+            },
+            {"Name": "file_key", "Value": file_key},
+            {
+                "Name": "new_file_key",
+                "Value": new_file_key or "N/A",
+            },
+            {
+                "Name": "current file count",
+                "Value": "N/A",
+            },
+        ],
+        "MeasureValue": str(file_size),
+    }
+
+
+def write_timestream_records(
+    timestream_client,
+    records,
     timestream_db=None,
     timestream_table=None,
-):
+) -> None:
     """
-    Function to Log to Timestream
+    Function to write Timestream records, in batches of the maximum of 100 records per request
     """
-    log.debug(f"Object ({new_file_key}) - Logging Event to Timestream")
-    CURRENT_TIME = str(int(time.time() * 1000))
+    log.debug(f"Logging {len(records)} Events to Timestream")
     try:
-        # Initialize Timestream Client
-        timestream = boto3_session.client("timestream-write")
-
-        if not source_bucket and not destination_bucket:
-            raise ValueError("A Source or Destination Buckets is required")
-
-        # Write to Timestream
-        timestream.write_records(
-            DatabaseName=timestream_db if timestream_db else "sdc_aws_logs",
-            TableName=timestream_table
-            if timestream_table
-            else "sdc_aws_s3_bucket_log_table",
-            Records=[
-                {
-                    "Time": CURRENT_TIME,
-                    "Dimensions": [
-                        {"Name": "action_type", "Value": action_type},
-                        {
-                            "Name": "source_bucket",
-                            "Value": source_bucket or "N/A",
-                        },
-                        {
-                            "Name": "destination_bucket",
-                            "Value": destination_bucket or "N/A",
-                        },
-                        {"Name": "file_key", "Value": file_key},
-                        {
-                            "Name": "new_file_key",
-                            "Value": new_file_key or "N/A",
-                        },
-                        {
-                            "Name": "current file count",
-                            "Value": "N/A",
-                        },
-                    ],
-                    "MeasureName": "timestamp",
-                    "MeasureValue": str(datetime.utcnow().timestamp()),
-                    "MeasureValueType": "DOUBLE",
+        for i in range(0, len(records), TIMESTREAM_MAX_RECORDS):
+            # Write to Timestream
+            timestream_client.write_records(
+                DatabaseName=timestream_db if timestream_db else "sdc_aws_logs",
+                TableName=timestream_table
+                if timestream_table
+                else "sdc_aws_s3_bucket_log_table",
+                CommonAttributes={
+                    "MeasureName": "file_size",
+                    "MeasureValueType": "BIGINT",
+                    "TimeUnit": "MILLISECONDS",
                 },
-            ],
-        )
+                Records=records[i : i + TIMESTREAM_MAX_RECORDS],
+            )
 
-        log.debug(
-            (f"Object ({new_file_key}) - Event Successfully Logged to Timestream")
-        )
+        log.debug(f"{len(records)} Events Successfully Logged to Timestream")
 
     except botocore.exceptions.ClientError as e:
         log.error({"status": "ERROR", "message": f"Error logging to Timestream: {e}"})
+
+
+def timestream_log(
+    boto3_session,
+    action_type,
+    file_key,
+    new_file_key=None,
+    source_bucket=None,
+    destination_bucket=None,
+    timestream_db=None,
+    timestream_table=None,
+    file_size=0,
+):
+    """
+    Function to Log to Timestream
+    """
+    log.debug(f"Object ({new_file_key}) - Logging Event to Timestream")
+
+    # Initialize Timestream Client
+    timestream = boto3_session.client("timestream-write")
+
+    write_timestream_records(
+        timestream_client=timestream,
+        records=[
+            generate_timestream_record(
+                action_type=action_type,
+                file_key=file_key,
+                new_file_key=new_file_key,
+                source_bucket=source_bucket,
+                destination_bucket=destination_bucket,
+                file_size=file_size,
+            )
+        ],
+        timestream_db=timestream_db,
+        timestream_table=timestream_table,
+    )
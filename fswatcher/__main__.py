@@ -1,11 +1,50 @@
 """
 Main File for the AWS File System Watcher
 """
+import errno
+import signal
 import sys
-import time
-from watchdog.observers import Observer
+from threading import Event
+from watchdog.observers.api import BaseObserver
 from fswatcher import config, log
-from fswatcher.FileSystemHandler import FileSystemHandler
+from fswatcher.FileSystemHandler import (
+    FileSystemHandler,
+    count_directories,
+    get_inotify_fds,
+    make_observer,
+    raise_inotify_watch_limit,
+    release_observer,
+)
+
+
+def start_observer(event_handler: FileSystemHandler) -> BaseObserver:
+    """
+    Function to start an observer watching the path, raising the inotify watch limit once if it is reached and allowed
+    """
+    watches_needed = None
+    while True:
+        observer = make_observer(config.path, config.poll_interval)
+        observer.schedule(event_handler, config.path, recursive=True)
+        inotify_fds = get_inotify_fds()
+        try:
+            observer.start()
+            return observer
+        except OSError as e:
+            # Release the inotify instance and watches the failed observer left behind
+            release_observer(observer, inotify_fds)
+
+            # Only retry once, if the watch limit was reached and raising it is enabled
+            if (
+                e.errno != errno.ENOSPC
+                or watches_needed is not None
+                or not config.raise_inotify_limit
+            ):
+                raise
+
+            # Raise the limit by the watches the whole tree needs
+            watches_needed = count_directories(config.path)
+            if not raise_inotify_watch_limit(watches_needed):
+                raise
 
 
 # Main Function
@@ -25,10 +64,8 @@ def main() -> None:
     try:
         # Initialize the Observer and start watching
         log.info("Starting observer")
-        observer = Observer()
-        observer.schedule(event_handler, config.path, recursive=True)
+        observer = start_observer(event_handler)
 
-        observer.start()
         # If backtrack is enabled, run the initial scan
         if config.backtrack:
             log.info(
@@ -39,7 +76,9 @@ def main() -> None:
             )
             log.info("Backtracking complete")
             config.backtrack = False
-        log.info(f"Watching for file events with INotify Observer in: {config.path}")
+        log.info(
+            f"Watching for file events with {type(observer).__name__} in: {config.path}"
+        )
 
     except OSError:
         # If inotify fails, use the polling observer
@@ -49,9 +88,11 @@ def main() -> None:
 
         event_handler.fallback_directory_watcher()
 
+    # Block until SIGTERM or SIGINT, instead of waking up periodically
+    stop_event = Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
     try:
-        while True:
-            time.sleep(1)
+        stop_event.wait()
     finally:
         observer.stop()
         observer.join()
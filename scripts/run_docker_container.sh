@@ -76,6 +76,15 @@ unset SDC_AWS_BACKTRACK_DATE
 unset SDC_AWS_USE_FALLBACK
 unset SDC_AWS_CHECK_S3
 unset SDC_AWS_PROFILE
+unset SDC_AWS_CHECK_S3_MODE
+unset SDC_AWS_MULTIPART_THRESHOLD
+unset SDC_AWS_MULTIPART_CHUNKSIZE
+unset SDC_AWS_MAX_IO_QUEUE
+unset SDC_AWS_USE_ACCELERATE
+unset SDC_AWS_POLL_INTERVAL
+unset SDC_AWS_USE_CRT
+unset SDC_AWS_RAISE_INOTIFY_LIMIT
+unset SDC_AWS_IO_CHUNKSIZE
 
 # Docker environment variables
 SDC_AWS_S3_BUCKET="-b $S3_BUCKET_NAME"
@@ -182,6 +191,69 @@ else
     SDC_AWS_PROFILE=""
 fi
 
+# If CHECK_S3_MODE is not "", then add it to the environment variables else make it empty
+if [ "$CHECK_S3_MODE" != "" ]; then
+    SDC_AWS_CHECK_S3_MODE="-csm $CHECK_S3_MODE"
+else
+    SDC_AWS_CHECK_S3_MODE=""
+fi
+
+# If MULTIPART_THRESHOLD is not "", then add it to the environment variables else make it empty
+if [ "$MULTIPART_THRESHOLD" != "" ]; then
+    SDC_AWS_MULTIPART_THRESHOLD="-mt $MULTIPART_THRESHOLD"
+else
+    SDC_AWS_MULTIPART_THRESHOLD=""
+fi
+
+# If MULTIPART_CHUNKSIZE is not "", then add it to the environment variables else make it empty
+if [ "$MULTIPART_CHUNKSIZE" != "" ]; then
+    SDC_AWS_MULTIPART_CHUNKSIZE="-mc $MULTIPART_CHUNKSIZE"
+else
+    SDC_AWS_MULTIPART_CHUNKSIZE=""
+fi
+
+# If MAX_IO_QUEUE is not "", then add it to the environment variables else make it empty
+if [ "$MAX_IO_QUEUE" != "" ]; then
+    SDC_AWS_MAX_IO_QUEUE="-mq $MAX_IO_QUEUE"
+else
+    SDC_AWS_MAX_IO_QUEUE=""
+fi
+
+# If USE_ACCELERATE is true, then add it to the environment variables else make it empty
+if [ "$USE_ACCELERATE" = true ]; then
+    SDC_AWS_USE_ACCELERATE="-ua"
+else
+    SDC_AWS_USE_ACCELERATE=""
+fi
+
+# If POLL_INTERVAL is not "", then add it to the environment variables else make it empty
+if [ "$POLL_INTERVAL" != "" ]; then
+    SDC_AWS_POLL_INTERVAL="-pi $POLL_INTERVAL"
+else
+    SDC_AWS_POLL_INTERVAL=""
+fi
+
+# If USE_CRT is true, then add it to the environment variables else make it empty
+if [ "$USE_CRT" = true ]; then
+    SDC_AWS_USE_CRT="-uc"
+else
+    SDC_AWS_USE_CRT=""
+fi
+
+# If RAISE_INOTIFY_LIMIT is true, then add it to the environment variables else make it empty
+if [ "$RAISE_INOTIFY_LIMIT" = true ]; then
+    SDC_AWS_RAISE_INOTIFY_LIMIT="-ril"
+else
+    SDC_AWS_RAISE_INOTIFY_LIMIT=""
+fi
+
+# If IO_CHUNKSIZE is not "", then add it to the environment variables else make it empty
+if [ "$IO_CHUNKSIZE" != "" ]; then
+    SDC_AWS_IO_CHUNKSIZE="-ic $IO_CHUNKSIZE"
+else
+    SDC_AWS_IO_CHUNKSIZE=""
+fi
+
 # Print all the environment variables
 echo "Passed Arguments:"
 echo "SDC_AWS_S3_BUCKET: $SDC_AWS_S3_BUCKET"
@@ -200,6 +272,15 @@ echo "SDC_AWS_BACKTRACK_DATE: $SDC_AWS_BACKTRACK_DATE"
 echo "SDC_AWS_USE_FALLBACK: $SDC_AWS_USE_FALLBACK"
 echo "SDC_AWS_CHECK_S3: $SDC_AWS_CHECK_S3"
 echo "SDC_AWS_PROFILE: $SDC_AWS_PROFILE"
+echo "SDC_AWS_CHECK_S3_MODE: $SDC_AWS_CHECK_S3_MODE"
+echo "SDC_AWS_MULTIPART_THRESHOLD: $SDC_AWS_MULTIPART_THRESHOLD"
+echo "SDC_AWS_MULTIPART_CHUNKSIZE: $SDC_AWS_MULTIPART_CHUNKSIZE"
+echo "SDC_AWS_MAX_IO_QUEUE: $SDC_AWS_MAX_IO_QUEUE"
+echo "SDC_AWS_USE_ACCELERATE: $SDC_AWS_USE_ACCELERATE"
+echo "SDC_AWS_POLL_INTERVAL: $SDC_AWS_POLL_INTERVAL"
+echo "SDC_AWS_USE_CRT: $SDC_AWS_USE_CRT"
+echo "SDC_AWS_RAISE_INOTIFY_LIMIT: $SDC_AWS_RAISE_INOTIFY_LIMIT"
+echo "SDC_AWS_IO_CHUNKSIZE: $SDC_AWS_IO_CHUNKSIZE"
 
 # Run the docker container in detached mode
 docker run -d \
@@ -221,6 +302,15 @@ docker run -d \
     -e SDC_AWS_TEST_IAM_POLICY="$SDC_AWS_TEST_IAM_POLICY" \
     -e SDC_AWS_USE_FALLBACK="$SDC_AWS_USE_FALLBACK" \
     -e SDC_AWS_PROFILE="$SDC_AWS_PROFILE" \
+    -e SDC_AWS_CHECK_S3_MODE="$SDC_AWS_CHECK_S3_MODE" \
+    -e SDC_AWS_MULTIPART_THRESHOLD="$SDC_AWS_MULTIPART_THRESHOLD" \
+    -e SDC_AWS_MULTIPART_CHUNKSIZE="$SDC_AWS_MULTIPART_CHUNKSIZE" \
+    -e SDC_AWS_MAX_IO_QUEUE="$SDC_AWS_MAX_IO_QUEUE" \
+    -e SDC_AWS_USE_ACCELERATE="$SDC_AWS_USE_ACCELERATE" \
+    -e SDC_AWS_POLL_INTERVAL="$SDC_AWS_POLL_INTERVAL" \
+    -e SDC_AWS_USE_CRT="$SDC_AWS_USE_CRT" \
+    -e SDC_AWS_RAISE_INOTIFY_LIMIT="$SDC_AWS_RAISE_INOTIFY_LIMIT" \
+    -e SDC_AWS_IO_CHUNKSIZE="$SDC_AWS_IO_CHUNKSIZE" \
     -e AWS_SESSION_TOKEN="$AWS_SESSION_TOKEN" \
     -v /etc/passwd:/etc/passwd \
     -v $WATCH_DIR:/watch \